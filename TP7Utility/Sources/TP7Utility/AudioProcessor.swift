@@ -6,6 +6,10 @@ class AudioProcessor {
     
     private init() {}
     
+    // ExtAudioFile's I/O buffer for output files; larger than the default so long
+    // conversions issue far fewer write calls
+    private static let outputIOBufferSize: UInt32 = 4 * 1024 * 1024
+    
     enum ProcessingError: LocalizedError {
         case invalidFile
         case unsupportedFormat
@@ -163,6 +167,14 @@ class AudioProcessor {
                 &stereoClientFormat
             )
             
+            var ioBufferSize = AudioProcessor.outputIOBufferSize
+            ExtAudioFileSetProperty(
+                outFile,
+                kExtAudioFileProperty_IOBufferSizeBytes,
+                UInt32(MemoryLayout<UInt32>.size),
+                &ioBufferSize
+            )
+            
             outputFiles.append(outFile)
         }
         
@@ -177,9 +189,13 @@ class AudioProcessor {
         let interleavedBuffer = UnsafeMutablePointer<Float>.allocate(capacity: interleavedBufferSize)
         defer { interleavedBuffer.deallocate() }
         
+        // One stereo buffer per track, laid out back to back (track-major)
         let stereoBufferSize = Int(chunkSize * 2)
-        let stereoBuffer = UnsafeMutablePointer<Float>.allocate(capacity: stereoBufferSize)
-        defer { stereoBuffer.deallocate() }
+        let trackBuffers = UnsafeMutablePointer<Float>.allocate(capacity: stereoBufferSize * numTracks)
+        defer { trackBuffers.deallocate() }
+        
+        let writeStatuses = UnsafeMutablePointer<OSStatus>.allocate(capacity: numTracks)
+        defer { writeStatuses.deallocate() }
         
         var totalFramesProcessed: Int64 = 0
         
@@ -205,33 +221,39 @@ class AudioProcessor {
                 throw ProcessingError.readError
             }
             
-            // Process each stereo track
-            for trackIndex in 0..<numTracks {
-                let leftChannelIndex = trackIndex * 2
-                let rightChannelIndex = trackIndex * 2 + 1
+            // Deinterleave all stereo pairs in a single pass over the chunk
+            for frameIndex in 0..<Int(framesToRead) {
+                let interleavedIndex = frameIndex * Int(channelCount)
+                let stereoIndex = frameIndex * 2
                 
-                // Deinterleave stereo data
-                for frameIndex in 0..<Int(framesToRead) {
-                    let interleavedIndex = frameIndex * Int(channelCount)
-                    let stereoIndex = frameIndex * 2
-                    
-                    stereoBuffer[stereoIndex] = interleavedBuffer[interleavedIndex + leftChannelIndex]
-                    stereoBuffer[stereoIndex + 1] = interleavedBuffer[interleavedIndex + rightChannelIndex]
+                for trackIndex in 0..<numTracks {
+                    let trackBuffer = trackBuffers + trackIndex * stereoBufferSize
+                    trackBuffer[stereoIndex] = interleavedBuffer[interleavedIndex + trackIndex * 2]
+                    trackBuffer[stereoIndex + 1] = interleavedBuffer[interleavedIndex + trackIndex * 2 + 1]
                 }
+            }
+            
+            // Write each stereo track concurrently (one output file per track)
+            let framesRead = framesToRead
+            DispatchQueue.concurrentPerform(iterations: numTracks) { trackIndex in
+                let stereoBuffer = trackBuffers + trackIndex * stereoBufferSize
                 
-                // Write stereo data
                 var stereoBufferList = AudioBufferList()
                 stereoBufferList.mNumberBuffers = 1
                 
                 withUnsafeMutablePointer(to: &stereoBufferList.mBuffers) { ptr in
                     ptr.withMemoryRebound(to: AudioBuffer.self, capacity: 1) { bufferPtr in
                         bufferPtr[0].mNumberChannels = 2
-                        bufferPtr[0].mDataByteSize = framesToRead * 8
+                        bufferPtr[0].mDataByteSize = framesRead * 8
                         bufferPtr[0].mData = UnsafeMutableRawPointer(stereoBuffer)
                     }
                 }
                 
-                let writeStatus = ExtAudioFileWrite(outputFiles[trackIndex], framesToRead, &stereoBufferList)
+                writeStatuses[trackIndex] = ExtAudioFileWrite(outputFiles[trackIndex], framesRead, &stereoBufferList)
+            }
+            
+            for trackIndex in 0..<numTracks {
+                let writeStatus = writeStatuses[trackIndex]
                 guard writeStatus == noErr else {
                     print("Failed to write to track \(trackIndex + 1), error code: \(writeStatus)")
                     throw ProcessingError.writeError
@@ -251,63 +273,52 @@ class AudioProcessor {
             throw ProcessingError.tooManyFiles
         }
         
+        // Opened files stay open for the data pass and are disposed on any exit,
+        // including validation failures below
         var audioFiles: [ExtAudioFileRef] = []
-        var maxFrameCount: Int64 = 0
-        var referenceSampleRate: Float64?
+        defer {
+            for file in audioFiles {
+                ExtAudioFileDispose(file)
+            }
+        }
+        
+        var formats: [AudioStreamBasicDescription] = []
+        var frameCounts: [Int64] = []
         
-        // Open all input files
+        // Open all input files and read their headers
         for url in inputURLs {
             var inputFile: ExtAudioFileRef?
             let status = ExtAudioFileOpenURL(url as CFURL, &inputFile)
             
             guard status == noErr, let file = inputFile else {
-                // Clean up already opened files
-                for openFile in audioFiles {
-                    ExtAudioFileDispose(openFile)
-                }
                 throw ProcessingError.invalidFile
             }
             
+            audioFiles.append(file)
+            
             // Get format
             var format = AudioStreamBasicDescription()
             var propertySize = UInt32(MemoryLayout<AudioStreamBasicDescription>.size)
             ExtAudioFileGetProperty(file, kExtAudioFileProperty_FileDataFormat, &propertySize, &format)
-            
-            // Verify stereo
-            guard format.mChannelsPerFrame == 2 else {
-                ExtAudioFileDispose(file)
-                for openFile in audioFiles {
-                    ExtAudioFileDispose(openFile)
-                }
-                throw ProcessingError.channelMismatch(expected: 2, found: Int(format.mChannelsPerFrame))
-            }
-            
-            // Check sample rate
-            if let refRate = referenceSampleRate {
-                guard format.mSampleRate == refRate else {
-                    ExtAudioFileDispose(file)
-                    for openFile in audioFiles {
-                        ExtAudioFileDispose(openFile)
-                    }
-                    throw ProcessingError.unsupportedFormat
-                }
-            } else {
-                referenceSampleRate = format.mSampleRate
-            }
+            formats.append(format)
             
             // Get frame count
             var frameCount: Int64 = 0
             propertySize = UInt32(MemoryLayout<Int64>.size)
             ExtAudioFileGetProperty(file, kExtAudioFileProperty_FileLengthFrames, &propertySize, &frameCount)
-            maxFrameCount = max(maxFrameCount, frameCount)
-            
-            audioFiles.append(file)
+            frameCounts.append(frameCount)
         }
         
-        defer {
-            for file in audioFiles {
-                ExtAudioFileDispose(file)
-            }
+        let maxFrameCount = frameCounts.max() ?? 0
+        
+        // Validate all headers together: every file must be stereo at the same sample rate
+        if let nonStereo = formats.first(where: { $0.mChannelsPerFrame != 2 }) {
+            throw ProcessingError.channelMismatch(expected: 2, found: Int(nonStereo.mChannelsPerFrame))
+        }
+        
+        let referenceSampleRate = formats.first?.mSampleRate
+        guard formats.allSatisfy({ $0.mSampleRate == referenceSampleRate }) else {
+            throw ProcessingError.unsupportedFormat
         }
         
         guard let sampleRate = referenceSampleRate else {
@@ -363,6 +374,14 @@ class AudioProcessor {
             &clientFormat
         )
         
+        var ioBufferSize = AudioProcessor.outputIOBufferSize
+        ExtAudioFileSetProperty(
+            outFile,
+            kExtAudioFileProperty_IOBufferSizeBytes,
+            UInt32(MemoryLayout<UInt32>.size),
+            &ioBufferSize
+        )
+        
         // Set client format for all input files
         for file in audioFiles {
             var stereoClientFormat = AudioStreamBasicDescription()
@@ -389,6 +408,10 @@ class AudioProcessor {
         let multitrackBuffer = UnsafeMutablePointer<Float>.allocate(capacity: multitrackBufferSize)
         defer { multitrackBuffer.deallocate() }
         
+        // Zero once up front: channels without an input file are never written and stay
+        // silent, so the buffer doesn't need clearing for every chunk
+        multitrackBuffer.initialize(repeating: 0, count: multitrackBufferSize)
+        
         let stereoBufferSize = Int(chunkSize * 2)
         let stereoBuffer = UnsafeMutablePointer<Float>.allocate(capacity: stereoBufferSize)
         defer { stereoBuffer.deallocate() }
@@ -398,11 +421,13 @@ class AudioProcessor {
         while totalFramesWritten < maxFrameCount {
             let framesToProcess = min(chunkSize, UInt32(maxFrameCount - totalFramesWritten))
             
-            // Clear multitrack buffer
-            memset(multitrackBuffer, 0, multitrackBufferSize * MemoryLayout<Float>.size)
-            
             // Read from each input file
             for (fileIndex, file) in audioFiles.enumerated() {
+                // A file that had no frames left for the previous chunk already zeroed
+                // its channels there, so they are still silent
+                let framesRemaining = frameCounts[fileIndex] - totalFramesWritten
+                guard framesRemaining + Int64(chunkSize) > 0 else { continue }
+                
                 var bufferList = AudioBufferList()
                 bufferList.mNumberBuffers = 1
                 
@@ -414,8 +439,10 @@ class AudioProcessor {
                     }
                 }
                 
-                var framesToRead = framesToProcess
-                ExtAudioFileRead(file, &framesToRead, &bufferList)
+                var framesToRead = UInt32(min(Int64(framesToProcess), max(framesRemaining, 0)))
+                if framesToRead > 0 {
+                    ExtAudioFileRead(file, &framesToRead, &bufferList)
+                }
                 
                 // Interleave into multitrack buffer
                 let leftChannel = fileIndex * 2
@@ -425,6 +452,12 @@ class AudioProcessor {
                     multitrackBuffer[i * Int(outputChannels) + leftChannel] = stereoBuffer[i * 2]
                     multitrackBuffer[i * Int(outputChannels) + rightChannel] = stereoBuffer[i * 2 + 1]
                 }
+                
+                // Pad shorter files with silence
+                for i in Int(framesToRead)..<Int(framesToProcess) {
+                    multitrackBuffer[i * Int(outputChannels) + leftChannel] = 0
+                    multitrackBuffer[i * Int(outputChannels) + rightChannel] = 0
+                }
             }
             
             // Write to output